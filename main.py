@@ -11,22 +11,122 @@ or to manually enter exclusion patterns. The final output file is saved in
 the same directory where this script is executed.
 """
 
-from typing import List, Set
-import fnmatch
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import itemgetter
+from typing import (
+    BinaryIO, Callable, Deque, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+)
+import codecs
+import gzip
+import io
 import os
+import re
+import threading
 
-def parse_gitignore(gitignore_path: str) -> Set[str]:
+try:
+    # Optional: google-re2 is faster for very large sets of exclusion patterns
+    import re2  # type: ignore[import-not-found]
+except ImportError:
+    re2 = None
+
+# Size of the write buffer for the output file (1 MiB)
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# gzip level used when the output file ends in '.gz' (1 = fastest)
+GZIP_COMPRESS_LEVEL = 1
+
+# Number of threads reading files. Reads mostly wait on I/O, so this can
+# safely be larger than the number of CPUs.
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Maximum number of files read ahead of the one currently being written
+READ_AHEAD = READ_WORKERS * 4
+
+# Minimum number of glob patterns before re2 (if installed) is used instead of re
+RE2_MIN_PATTERNS = 64
+
+# How much of a file is checked for NUL bytes to detect binary content (same as git)
+BINARY_PROBE_SIZE = 8000
+
+# Extensions of binary formats that are skipped without opening the file
+BINARY_EXTENSIONS = frozenset({
+    # Images
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.icns', '.webp', '.tif', '.tiff', '.psd',
+    # Documents
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.odt', '.ods', '.odp',
+    # Archives
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.tar', '.jar', '.war', '.whl', '.egg',
+    # Compiled code and libraries
+    '.exe', '.dll', '.so', '.dylib', '.o', '.obj', '.a', '.lib', '.bin', '.class',
+    '.pyc', '.pyo', '.pyd', '.wasm',
+    # Audio and video
+    '.mp3', '.wav', '.flac', '.ogg', '.m4a', '.mp4', '.avi', '.mov', '.mkv', '.webm',
+    # Fonts
+    '.ttf', '.otf', '.woff', '.woff2', '.eot',
+    # Databases and data dumps
+    '.db', '.sqlite', '.sqlite3', '.npy', '.npz', '.pkl', '.pickle', '.parquet',
+    # Disk images
+    '.iso', '.dmg',
+})
+
+# Size of the extra reads for files that grew after they were listed (64 KiB)
+READ_CHUNK_SIZE = 1 << 16
+
+# Size of the slices non-ASCII files are validated in (64 KiB)
+UTF8_CHUNK_SIZE = 1 << 16
+
+# The markdown fences written around each file's content
+BLOCK_START = b"\n```\n"
+BLOCK_END = b"\n```\n\n"
+
+# Characters that make a pattern a glob rather than a plain name or path
+GLOB_CHARS = '*?[\\'
+
+# The POSIX character classes allowed in bracket expressions (e.g., '[[:digit:]]'),
+# as the ASCII ranges git's wildmatch uses for them
+POSIX_CLASSES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    'alnum': (('0', '9'), ('A', 'Z'), ('a', 'z')),
+    'alpha': (('A', 'Z'), ('a', 'z')),
+    'blank': (('\t', '\t'), (' ', ' ')),
+    'cntrl': (('\x00', '\x1f'), ('\x7f', '\x7f')),
+    'digit': (('0', '9'),),
+    'graph': (('!', '~'),),
+    'lower': (('a', 'z'),),
+    'print': ((' ', '~'),),
+    'punct': (('!', '/'), (':', '@'), ('[', '`'), ('{', '~')),
+    'space': (('\t', '\r'), (' ', ' ')),
+    'upper': (('A', 'Z'),),
+    'xdigit': (('0', '9'), ('A', 'F'), ('a', 'f')),
+}
+
+# On Windows a file's size is part of the directory listing, while elsewhere
+# DirEntry.stat() is a full stat call
+SIZE_IN_LISTING = os.name == 'nt'
+
+# Paths are case-insensitive on some platforms (e.g., Windows), and so is matching them
+CASE_INSENSITIVE = os.path.normcase('A') == 'a'
+
+# Per-thread state for the reader threads (e.g., each one's UTF-8 decoder)
+_thread_state = threading.local()
+
+class BinaryFileError(Exception):
+    """Raised when a file's content shows that it is binary rather than text."""
+
+def parse_gitignore(gitignore_path: str) -> List[str]:
     """
-    Parses a .gitignore file and returns a set of patterns.
+    Parses a .gitignore file and returns its patterns.
     
     Args:
         gitignore_path: The absolute path to the .gitignore file.
         
     Returns:
-        A set of strings, where each string is a gitignore pattern.
+        A list of strings, where each string is a gitignore pattern
+        (see ExclusionMatcher for how they are matched). The file's order
+        is kept, because a later '!' pattern can re-include an earlier match.
         Lines that are empty or start with '#' are ignored.
     """
-    patterns = set()
+    patterns: List[str] = []
     if not os.path.isfile(gitignore_path):
         return patterns
         
@@ -36,122 +136,741 @@ def parse_gitignore(gitignore_path: str) -> Set[str]:
                 stripped_line = line.strip()
                 # Ignore comments and empty lines
                 if stripped_line and not stripped_line.startswith('#'):
-                    patterns.add(stripped_line)
+                    patterns.append(stripped_line)
 
     except Exception as e:
         print(f"Warning: Could not read .gitignore file at {gitignore_path}. Error: {e}")
 
     return patterns
 
-def get_user_exclusions() -> Set[str]:
+def get_user_exclusions() -> List[str]:
     """
     Prompts the user to manually enter exclusion patterns.
     
     Returns:
-        A set of strings, where each string is a user-provided pattern.
-        Input is split by commas.
+        A list of strings, where each string is a user-provided pattern,
+        in the order they were entered. Input is split by commas.
     """
     print("\nPlease enter patterns to exclude (e.g., *.log, dist, build, *.tmp)")
     user_input = input("Separate multiple patterns with a comma: ").strip()
     
     if not user_input:
-        return set()
+        return []
         
     # Split by comma and strip whitespace from each pattern
-    patterns = {pattern.strip() for pattern in user_input.split(',')}
+    patterns = [pattern.strip() for pattern in user_input.split(',')]
     return patterns
 
-def create_project_snapshot(root_dir: str, exclude_patterns: Set[str], output_file_path: str):
+def translate_glob(pattern: str) -> str:
     """
-    Generates the project snapshot text file.
+    Translates a single gitignore-style glob into a regular expression.
     
-    It walks through the root_dir, skipping excluded files/directories,
-    and writes the formatted content to the output_file_path.
+    Unlike fnmatch, '*' and '?' never match a '/', so they stay inside one
+    path segment, while a '**' segment matches any number of directories:
+    '**/logs' matches 'logs' at any depth, 'logs/**' matches everything inside
+    'logs', and 'a/**/b' matches 'a/b', 'a/x/b', 'a/x/y/b' and so on.
+    
+    Args:
+        pattern: The glob, without any leading '!' or leading/trailing '/'.
+        
+    Returns:
+        The regex source, meant to be used with fullmatch(). Only plain regex
+        syntax is used, so the result also compiles with re2.
+    """
+    segments = pattern.split('/')
+    parts = []
+    
+    for index, segment in enumerate(segments):
+        is_last = index == len(segments) - 1
+        
+        if segment == '**':
+            parts.append('.*' if is_last else '(?:.*/)?')
+            continue
+            
+        i, n = 0, len(segment)
+        while i < n:
+            char = segment[i]
+            i += 1
+            
+            if char == '*':
+                # Any other run of stars acts like a single '*'
+                while i < n and segment[i] == '*':
+                    i += 1
+                parts.append('[^/]*')
+                
+            elif char == '?':
+                parts.append('[^/]')
+                
+            elif char == '\\' and i < n:
+                # A backslash makes the next character literal (e.g., \# or \!)
+                parts.append(re.escape(segment[i]))
+                i += 1
+                
+            elif char == '[':
+                # Find the closing bracket; a ']' right after '[' or '[!' is part of the set,
+                # and so are an escaped ']' (e.g., '[\]]') and the ']' of a '[:digit:]' class
+                j = i
+                if j < n and segment[j] in '!^':
+                    j += 1
+                if j < n and segment[j] == ']':
+                    j += 1
+                while j < n and segment[j] != ']':
+                    if segment[j] == '\\':
+                        j += 2
+                        continue
+                    if segment.startswith('[:', j):
+                        end = segment.find(':]', j + 2)
+                        if end != -1:
+                            j = end + 2
+                            continue
+                    j += 1
+                    
+                if j >= n:
+                    # No closing bracket, so it's just a literal '['
+                    parts.append('\\[')
+                    continue
+                    
+                chars = segment[i:j]
+                i = j + 1
+                negate = chars[:1] in ('!', '^')
+                parts.append(translate_char_class(chars[1:] if negate else chars, negate))
+                
+            else:
+                parts.append(re.escape(char))
+                
+        if not is_last:
+            parts.append('/')
+            
+    return "".join(parts)
+
+def translate_char_class(chars: str, negate: bool) -> str:
+    """
+    Translates the inside of a glob bracket expression (e.g., 'a-z0-9') to a regex.
+    
+    POSIX classes such as '[:digit:]' are expanded to their ASCII ranges, and
+    an unknown class matches nothing. As in git, a bracket expression never
+    matches a '/', whether it is negated or not. Reversed ranges such as 'z-a' match nothing and are dropped, the
+    same way fnmatch handles them, instead of producing an invalid regex.
+    
+    Args:
+        chars: The characters between the brackets, without a leading '!' or '^'.
+        negate: Whether the bracket expression was negated ('[!...]').
+        
+    Returns:
+        The regex source for one character.
+    """
+    ranges: List[Tuple[str, str]] = []
+    i, n = 0, len(chars)
+    
+    while i < n:
+        if chars.startswith('[:', i):
+            end = chars.find(':]', i + 2)
+            if end != -1:
+                ranges.extend(POSIX_CLASSES.get(chars[i + 2:end], ()))
+                i = end + 2
+                continue
+                
+        first = chars[i]
+        i += 1
+        if first == '\\' and i < n:
+            first = chars[i]
+            i += 1
+            
+        last = first
+        if i + 1 < n and chars[i] == '-':
+            last = chars[i + 1]
+            i += 2
+            if last == '\\' and i < n:
+                last = chars[i]
+                i += 1
+                
+        if first > last:
+            # An empty range like 'z-a' can't match anything
+            continue
+            
+        ranges.append((first, last))
+        
+    allowed: List[Tuple[str, str]] = []
+    for first, last in ranges:
+        if negate or not first <= '/' <= last:
+            allowed.append((first, last))
+            continue
+            
+        # Cut the '/' out of the range, so e.g. '.-0' becomes '.' and '0'
+        if first < '/':
+            allowed.append((first, '.'))
+        if last > '/':
+            allowed.append(('0', last))
+            
+    # Escape every character, so no set operations or stray ranges sneak in
+    escaped = "".join(
+        re.escape(first) if first == last else f"{re.escape(first)}-{re.escape(last)}"
+        for first, last in allowed
+    )
+    
+    if negate:
+        return f"[^/{escaped}]"
+        
+    # Nothing left to match, e.g. '[z-a]' or '[/]'. (?!) isn't valid in re2, so use an empty set
+    return f"[{escaped}]" if escaped else r'[^\s\S]'
+
+# The fullmatch() of a compiled pattern. re and re2 return different match objects,
+# so only "None or not None" is relied on.
+FullMatch = Callable[[str], Optional[object]]
+
+def compile_pattern_union(regexes: Set[str]) -> FullMatch:
+    """
+    Compiles a set of translated patterns into a single regular expression.
+    
+    All of them are OR'ed into one alternation, so checking a name costs a
+    single regex match instead of one match per pattern.
+    
+    For large pattern sets (e.g., a long .gitignore) the optional google-re2
+    package is used when it is installed. RE2 matches in time linear in the
+    name, however many alternatives there are, while the built-in re module
+    backtracks through them one by one. Patterns RE2 can't compile fall back to re.
+    
+    Args:
+        regexes: A set of regex sources, e.g. from translate_glob().
+        
+    Returns:
+        The fullmatch() method of the compiled pattern (from re, or the equivalent
+        from re2). It returns a match if a name matches any of the regexes.
+        With no regexes, it never matches.
+    """
+    if not regexes:
+        # An empty alternation would match everything, so use a pattern that can't match
+        return re.compile(r'(?!)').fullmatch
+
+    combined = "|".join(f"(?:{regex})" for regex in sorted(regexes))
+
+    # File names may contain newlines, and matching follows the platform's case rules
+    combined = ("(?si)" if CASE_INSENSITIVE else "(?s)") + combined
+
+    if re2 is not None and len(regexes) >= RE2_MIN_PATTERNS:
+        try:
+            fullmatch: FullMatch = re2.compile(combined).fullmatch
+            return fullmatch
+        except re2.error:
+            pass
+
+    return re.compile(combined).fullmatch
+
+# A parsed exclusion pattern: (negated, dir_only, anchored, is_glob, pattern)
+ParsedPattern = Tuple[bool, bool, bool, bool, str]
+
+# Compiled exclusion rules: (literal_names, literal_paths, match_name, match_path)
+Rules = Tuple[FrozenSet[str], FrozenSet[str], FullMatch, FullMatch]
+
+class ExclusionMatcher:
+    """
+    Decides whether a file or directory matches any of the exclusion patterns.
+    
+    Patterns follow the .gitignore rules:
+    
+      * A pattern without a slash (e.g., '*.log' or 'node_modules') matches
+        the name of a file or directory at any depth.
+      * A pattern with a slash at the start or in the middle (e.g., '/build'
+        or 'src/logs') matches the path relative to the project root.
+      * A trailing slash (e.g., 'build/') makes a pattern match directories only.
+      * '*' and '?' never match a '/', and '**' matches across directories.
+      * Bracket expressions (e.g., '[a-z]', '[!0-9]', '[\\]]' or '[[:digit:]]')
+        match a single character other than '/'.
+      * A leading '!' (e.g., '!keep.log') re-includes what earlier patterns exclude.
+        As in git, the last matching pattern wins, and nothing inside an
+        excluded directory can be re-included.
+    
+    Consecutive patterns of the same kind (excluding or re-including) are
+    compiled together, and the groups are checked from last to first. Without
+    any '!' patterns there is a single group, so a check stays one pass.
+    
+    Most patterns are plain names such as '.git' or 'node_modules'. Those are
+    kept in a frozenset and checked with a single hash lookup, and only the
+    real glob patterns go through a combined regex.
+    
+    Since the walker checks every directory before it descends into it, an
+    excluded directory prefix rejects everything below it with one lookup per
+    directory, and its files are never even listed.
+    """
+    
+    def __init__(self, exclude_patterns: Sequence[str]) -> None:
+        """
+        Args:
+            exclude_patterns: Gitignore-style patterns to exclude, in order.
+                Later patterns take precedence over earlier ones.
+        """
+        parsed: List[ParsedPattern] = []
+        for pattern in exclude_patterns:
+            negated = pattern.startswith('!')
+            if negated:
+                pattern = pattern[1:]
+                
+            # A trailing slash means the pattern only applies to directories
+            dir_only = pattern.endswith('/')
+            
+            # A slash anywhere but the end anchors the pattern to the project root
+            anchored = '/' in pattern.rstrip('/')
+            pattern = pattern.strip('/')
+            if not pattern:
+                continue
+                
+            is_glob = any(char in pattern for char in GLOB_CHARS)
+            if not is_glob and CASE_INSENSITIVE:
+                pattern = pattern.lower()
+                
+            parsed.append((negated, dir_only, anchored, is_glob, pattern))
+            
+        # Files are matched by every pattern except the directory-only ones
+        self.file_groups = self._build_groups(parsed, include_dir_only=False)
+        self.dir_groups = self._build_groups(parsed, include_dir_only=True)
+        
+    @staticmethod
+    def _build_groups(parsed: List[ParsedPattern], include_dir_only: bool) -> List[Tuple[bool, Rules]]:
+        """
+        Splits the parsed patterns into runs of consecutive patterns that are
+        all negated or all not, and compiles each run.
+        
+        Returns:
+            (negated, rules) tuples, last run first, so is_excluded() can stop
+            at the first group that matches.
+        """
+        runs: List[Tuple[bool, List[ParsedPattern]]] = []
+        for parsed_pattern in parsed:
+            negated, dir_only = parsed_pattern[0], parsed_pattern[1]
+            if dir_only and not include_dir_only:
+                continue
+                
+            if runs and runs[-1][0] == negated:
+                runs[-1][1].append(parsed_pattern)
+            else:
+                runs.append((negated, [parsed_pattern]))
+                
+        return [(negated, ExclusionMatcher._compile_rules(run)) for negated, run in reversed(runs)]
+        
+    @staticmethod
+    def _compile_rules(run: List[ParsedPattern]) -> Rules:
+        """
+        Groups a run of parsed patterns into lookup sets and combined regexes.
+        
+        Returns:
+            A (literal_names, literal_paths, match_name, match_path) tuple.
+        """
+        literal_names: Set[str] = set()
+        literal_paths: Set[str] = set()
+        name_regexes: Set[str] = set()
+        path_regexes: Set[str] = set()
+        
+        for _negated, _dir_only, anchored, is_glob, pattern in run:
+            if is_glob:
+                (path_regexes if anchored else name_regexes).add(translate_glob(pattern))
+            else:
+                (literal_paths if anchored else literal_names).add(pattern)
+                
+        return (
+            frozenset(literal_names),
+            frozenset(literal_paths),
+            compile_pattern_union(name_regexes),
+            compile_pattern_union(path_regexes),
+        )
+        
+    def is_excluded(self, name: str, relative_path: str, is_dir: bool = False) -> bool:
+        """
+        Checks a file or directory against the exclusion patterns.
+        
+        Args:
+            name: The simple file or directory name (e.g., "test.log").
+            relative_path: Its path relative to the project root (e.g., "src/logs/test.log").
+            is_dir: Whether this is a directory, so directory-only patterns apply too.
+            
+        Returns:
+            True if the last pattern matching the name or the relative path
+            is an excluding one, False if it is a '!' pattern or nothing matches.
+        """
+        if CASE_INSENSITIVE:
+            name = name.lower()
+            relative_path = relative_path.lower()
+            
+        for negated, (literal_names, literal_paths, match_name, match_path) in (
+            self.dir_groups if is_dir else self.file_groups
+        ):
+            # Fast path: exact names and paths are a single hash lookup
+            if (
+                name in literal_names
+                or relative_path in literal_paths
+                or match_name(name) is not None
+                or match_path(relative_path) is not None
+            ):
+                return not negated
+                
+        return False
+
+def walk_project_files(root_dir: str, matcher: ExclusionMatcher) -> Iterator[Tuple[str, str, Optional[int]]]:
+    """
+    Recursively yields every file under root_dir that is not excluded.
+    
+    Uses os.scandir directly so that the file/directory type comes from the
+    directory listing itself in most cases, instead of a separate stat call
+    per entry. Excluded directories are never descended into.
     
     Args:
         root_dir: The absolute path to the target project directory.
-        exclude_patterns: A set of patterns (fnmatch/gitignore style) to exclude.
-        output_file_path: The absolute path where the final .txt file will be saved.
+        matcher: The ExclusionMatcher built from the exclusion patterns.
+        
+    Yields:
+        (file_path, relative_path, size) tuples. The relative path always uses
+        forward slashes (/), just like in .gitignore. On Windows the size comes
+        from the directory listing for free; elsewhere it would cost a stat call
+        on this thread, so it is None and left to the reader threads.
     """
+    # Each stack item is a directory's absolute path and its relative path with a
+    # trailing slash ('' for the root), so a child's relative path is one concatenation.
+    stack = [(root_dir, '')]
     
-    # Get just the filename of the output file to prevent it from being included
-    # if the script is run on the same directory it's in.
-    output_filename = os.path.basename(output_file_path)
+    # Bind the per-entry calls to locals once, instead of looking them up for every entry
+    is_excluded = matcher.is_excluded
+    scandir = os.scandir
     
-    all_file_contents = []
+    while stack:
+        dirpath, rel_prefix = stack.pop()
+        subdirs: List[Tuple[str, str]] = []
+        
+        try:
+            with scandir(dirpath) as entries:
+                for entry in entries:
+                    name = entry.name
+                    
+                    # The relative path is built by concatenation instead of calling
+                    # os.path.relpath, which would re-normalize both paths every time.
+                    # (The absolute path already comes joined from entry.path.)
+                    relative_path = rel_prefix + name
+                    
+                    try:
+                        # Symlinked directories are not followed, just like os.walk
+                        if entry.is_dir(follow_symlinks=False):
+                            # --- Directory Pruning ---
+                            # Check both the directory name (e.g., "logs") and its relative
+                            # path (e.g., "src/logs"), so path patterns prune whole sub-trees
+                            # instead of being checked against every file inside them.
+                            if not is_excluded(name, relative_path, True):
+                                subdirs.append((entry.path, relative_path + '/'))
+                            continue
+                            
+                        # Skip anything that is not a regular file (or a link to one), e.g. sockets
+                        if not entry.is_file():
+                            continue
 
-    print("\nStarting project traversal...")
+                    except OSError:
+                        continue
+                        
+                    # --- File Filtering ---
+                    # We check both the simple filename (e.g., "test.log")
+                    # and the relative path (e.g., "src/logs/test.log")
+                    if is_excluded(name, relative_path, False):
+                        continue
+                        
+                    size: Optional[int] = None
+                    if SIZE_IN_LISTING:
+                        try:
+                            size = entry.stat().st_size
+                        except OSError:
+                            continue
+                        
+                    yield entry.path, relative_path, size
+
+        except OSError as e:
+            # This catches permission errors on the directory itself, or a listing
+            # that fails part-way through
+            print(f"Error reading directory {rel_prefix[:-1] or dirpath}: {e}")
+            
+        # Push in reverse so sub-directories are visited in listing order.
+        # This also runs after an error, so the sub-directories listed before it are kept.
+        stack.extend(reversed(subdirs))
+
+def has_binary_extension(path: str) -> bool:
+    """
+    Checks whether a file name has a well-known binary extension.
+    
+    Args:
+        path: The file name or path (e.g., "assets/logo.png").
+        
+    Returns:
+        True if the extension is in BINARY_EXTENSIONS (case-insensitive).
+    """
+    return os.path.splitext(path)[1].lower() in BINARY_EXTENSIONS
 
-    # os.walk allows us to traverse the directory tree
-    # topdown=True lets us "prune" directories from the traversal,
-    # which is much more efficient than checking every file inside.
-    for dirpath, dirnames, filenames in os.walk(root_dir, topdown=True):
+def validate_utf8(data: bytearray) -> None:
+    """
+    Checks that data is valid UTF-8 without decoding it all at once.
+    
+    Decoding a whole file just to validate it would allocate a str as large as
+    the file (up to four times larger for non-Latin text), only to throw it
+    away. Instead, each worker thread keeps one incremental decoder and feeds
+    it fixed-size slices, so the temporary strings (and the decoder's copies
+    of each slice) stay bounded by the slice size rather than the file size.
+    
+    Files that fit in a single slice, which is most of them, are simply
+    decoded in one call, since the incremental decoder's extra steps cost
+    more than they save there.
+    
+    Args:
+        data: The raw file content.
         
-        # --- Directory Pruning ---
-        # We modify dirnames *in-place* to prevent os.walk from descending
-        # into directories that match our exclusion patterns.
+    Raises:
+        UnicodeDecodeError: If the data is not valid UTF-8.
+    """
+    if len(data) <= UTF8_CHUNK_SIZE:
+        data.decode('utf-8')
+        return
         
-        # Create a list of directories to keep
-        dirs_to_keep = []
-        for d in dirnames:
-            # Check if the directory name itself matches any pattern
-            is_excluded = any(fnmatch.fnmatch(d, p) for p in exclude_patterns)
-            if not is_excluded:
-                dirs_to_keep.append(d)
+    decoder = getattr(_thread_state, 'utf8_decoder', None)
+    if decoder is None:
+        decoder = _thread_state.utf8_decoder = codecs.getincrementaldecoder('utf-8')()
         
-        # This in-place modification is the key to pruning
-        dirnames[:] = dirs_to_keep
+    # A previous file may have failed half-way, so start from a clean state
+    decoder.reset()
+    
+    with memoryview(data) as view:
+        # Characters split across two slices are carried over by the decoder
+        for start in range(0, len(view), UTF8_CHUNK_SIZE):
+            decoder.decode(view[start:start + UTF8_CHUNK_SIZE])
+            
+    # Fails if the data ends in the middle of a character
+    decoder.decode(b'', final=True)
 
-        # --- File Processing ---
-        for filename in filenames:
+def read_text_file(file_path: str, size: Optional[int]) -> bytearray:
+    """
+    Reads a whole file and checks that it is valid UTF-8 text.
+    
+    The file is opened unbuffered and read straight into a buffer pre-sized from
+    the size the walker already got (or an fstat, where listing the directory
+    doesn't give it), so the work per file is just open, read and close. The buffer has room for one byte more than that, so the read that
+    reaches the end comes up short, and no extra read is needed to find out.
+    The size is only a hint, though: if that extra byte gets filled, the file
+    grew after it was listed, and it is still read to the end.
+    A buffered text stream would also probe the file (isatty, seek), read it
+    in pieces and copy it through an internal buffer before decoding.
+    
+    The content is kept as raw bytes so it can be written to the output as-is.
+    Pure ASCII files (most source files) are valid UTF-8 by definition and are
+    not decoded at all; anything else goes through validate_utf8().
+    
+    The start of the file is read first and checked for a NUL byte, the same
+    heuristic git uses to spot binary files, so the rest of a large binary
+    file is never read or decoded.
+    
+    Args:
+        file_path: The absolute path to the file.
+        size: The expected file size, e.g. from walk_project_files(), or None
+            to take it from the open file.
+        
+    Returns:
+        The raw file content. Line endings are kept exactly as they are on disk.
+        
+    Raises:
+        BinaryFileError: If the file contains a NUL byte near the start.
+        UnicodeDecodeError: If the file is not valid UTF-8 (e.g., a binary file).
+        OSError: If the file can't be opened or read.
+    """
+    with open(file_path, 'rb', buffering=0) as f:
+        # Outside Windows the walker leaves the size to this thread, where the
+        # stat runs in parallel with the other reads
+        if size is None:
+            size = os.fstat(f.fileno()).st_size
             
-            # 1. Skip the output file itself
-            if filename == output_filename:
-                continue
+        # One byte more than expected, so the read that reaches the end comes up
+        # short and no extra read is needed just to get nothing back
+        capacity = size + 1
+        data = bytearray(capacity)
+        
+        with memoryview(data) as view:
+            wanted = min(capacity, BINARY_PROBE_SIZE)
+            n = f.readinto(view[:wanted]) or 0
+            if data.find(b'\x00', 0, n) != -1:
+                raise BinaryFileError(f"NUL byte found in {file_path}")
+                
+            # A read that fills less than asked has reached the end of the file
+            if n == wanted < capacity:
+                n += f.readinto(view[n:]) or 0
                 
-            file_path = os.path.join(dirpath, filename)
+        del data[n:]
+        
+        # Only if the extra byte got filled has the file grown, so keep reading
+        # until a read returns nothing
+        if n == capacity:
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                data += chunk
+                
+            # The part that was added may still be within the range checked for NUL bytes
+            if capacity < BINARY_PROBE_SIZE and data.find(b'\x00', capacity, BINARY_PROBE_SIZE) != -1:
+                raise BinaryFileError(f"NUL byte found in {file_path}")
+        
+    if not data.isascii():
+        validate_utf8(data)
+        
+    return data
+
+def read_files_concurrently(files: Iterable[Tuple[str, str, Optional[int]]]) -> Iterator[Tuple[str, "Future[bytearray]"]]:
+    """
+    Reads files on a pool of worker threads while keeping their original order.
+    
+    Opening and reading a file mostly waits on the disk (or the network, for
+    NFS / Docker volumes), and the GIL is released during that wait, so several
+    reads in flight hide most of the latency. Only a bounded number of files is
+    read ahead, so memory use stays flat however large the project is.
+    
+    Args:
+        files: (file_path, relative_path, size) tuples, e.g. from walk_project_files().
+        
+    Yields:
+        (relative_path, future) tuples in the same order as files. Calling
+        future.result() returns the content from read_text_file(), or
+        re-raises whatever error reading the file caused.
+    """
+    pending: Deque[Tuple[str, "Future[bytearray]"]] = deque()
+    
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        for file_path, relative_path, size in files:
+            pending.append((relative_path, executor.submit(read_text_file, file_path, size)))
             
-            # 2. Get the relative path for display and pattern matching
-            # We normalize to forward slashes (/) for consistency, just like in .gitignore
-            try:
-                relative_path = os.path.relpath(file_path, root_dir).replace(os.sep, '/')
+            # Hand back the oldest file once enough reads are queued behind it
+            if len(pending) >= READ_AHEAD:
+                yield pending.popleft()
+                
+        while pending:
+            yield pending.popleft()
 
-            except ValueError:
-                # This can happen on Windows if root_dir and file_path are on different drives
-                print(f"Skipping file on different drive: {file_path}")
-                continue
+def open_output_file(output_file_path: str) -> BinaryIO:
+    """
+    Opens the output file for writing, compressed with gzip if it ends in '.gz'.
+    
+    Snapshots are almost all text, so gzip shrinks them several times over.
+    Level 1 is used because it runs at close to copying speed and still gets
+    most of that gain on source code.
+    
+    Args:
+        output_file_path: The absolute path where the final file will be saved.
+        
+    Returns:
+        A buffered binary file object.
+    """
+    if output_file_path.lower().endswith('.gz'):
+        # Buffer in front of gzip so the small header/footer writes are compressed in large chunks
+        compressed = gzip.open(output_file_path, 'wb', compresslevel=GZIP_COMPRESS_LEVEL)
+        return io.BufferedWriter(compressed, buffer_size=OUTPUT_BUFFER_SIZE)
+        
+    return open(output_file_path, 'wb', buffering=OUTPUT_BUFFER_SIZE)
 
-            # 3. Check if the file or its path matches any exclusion pattern
-            # We check both the simple filename (e.g., "test.log")
-            # and the relative path (e.g., "src/logs/test.log")
-            if any(fnmatch.fnmatch(filename, p) or fnmatch.fnmatch(relative_path, p) for p in exclude_patterns):
-                continue
+def get_output_exclusion(root_dir: str, output_file_path: str) -> Optional[str]:
+    """
+    Builds the exclusion pattern for the output file, if it is inside root_dir.
+    
+    Args:
+        root_dir: The absolute path to the target project directory.
+        output_file_path: The absolute path of the output file.
+        
+    Returns:
+        An anchored pattern matching only the output file (e.g., "/project_snapshot.txt"),
+        or None if the output file is outside the project.
+    """
+    try:
+        relative_path = os.path.relpath(output_file_path, root_dir)
+
+    except ValueError:
+        # This can happen on Windows if both paths are on different drives
+        return None
+        
+    if relative_path == os.pardir or relative_path.startswith(os.pardir + os.sep):
+        return None
+        
+    # Escape glob characters so the file name is matched literally
+    relative_path = re.sub(r'([*?\[\\])', r'\\\1', relative_path.replace(os.sep, '/'))
+    return '/' + relative_path
+
+def create_project_snapshot(root_dir: str, exclude_patterns: Sequence[str], output_file_path: str) -> None:
+    """
+    Generates the project snapshot text file.
+    
+    It walks through the root_dir, skipping excluded files/directories,
+    and writes the formatted content to the output_file_path.
+    
+    Args:
+        root_dir: The absolute path to the target project directory.
+        exclude_patterns: Gitignore-style patterns to exclude, in order.
+            Later patterns take precedence over earlier ones.
+        output_file_path: The absolute path where the final .txt file will be saved.
+            If it ends in '.gz' (e.g., "project_snapshot.txt.gz"), the output is gzip-compressed.
+    """
+    
+    # Prevent the output file from being included if the script is run on the
+    # same directory it's in. It is excluded by an anchored pattern (e.g.,
+    # "/project_snapshot.txt"), so only that exact file is skipped and no
+    # per-file check is needed.
+    output_file_path = os.path.abspath(output_file_path)
+    output_pattern = get_output_exclusion(root_dir, output_file_path)
+    if output_pattern is not None:
+        # Added last, so no '!' pattern can re-include it
+        exclude_patterns = [*exclude_patterns, output_pattern]
+    
+    # Compile the patterns once up front instead of for every file
+    matcher = ExclusionMatcher(exclude_patterns)
+
+    print("\nStarting project traversal...")
 
-            # 4. Try to read the file as text
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+    try:
+        # --- First Pass: Listing the Files ---
+        # Only directory entries are looked at here, no file is opened, so this is cheap.
+        # Sorting by relative path makes the output order the same on every platform
+        # and file system, whatever order the directories happen to be listed in.
+        files: List[Tuple[str, str, Optional[int]]] = []
+        for file_path, relative_path, size in walk_project_files(root_dir, matcher):
+            
+            # 1. Skip well-known binary formats without even opening them
+            if has_binary_extension(relative_path):
+                print(f"Ignoring binary file: {relative_path}")
+                continue
                 
-                # Format the content as requested
-                formatted_block = f"{relative_path}\n```\n{content}\n```\n\n"
-                all_file_contents.append(formatted_block)
+            files.append((file_path, relative_path, size))
+            
+        files.sort(key=itemgetter(1))
+        
+        # --- Second Pass: Reading and Writing ---
+        # Each file's block is written as soon as it is read, so the snapshot
+        # never has to be held in memory as a whole.
+        # The output is written in binary: file contents are already UTF-8 bytes,
+        # so they are copied as-is instead of being decoded and encoded again.
+        with open_output_file(output_file_path) as out:
+
+            # Reading happens on worker threads, but writing stays on this thread
+            # and follows the sorted order, so the output is the same either way.
+            write = out.write
+            for relative_path, future in read_files_concurrently(files):
                 
-            except UnicodeDecodeError:
-                # This catches binary files (images, executables, etc.)
-                print(f"Ignoring binary or non-UTF-8 file: {relative_path}")
+                # 2. Try to read the file as UTF-8 text
+                try:
+                    content = future.result()
+                    
+                except (BinaryFileError, UnicodeDecodeError):
+                    # This catches binary files (images, executables, etc.)
+                    print(f"Ignoring binary or non-UTF-8 file: {relative_path}")
 
-            except IOError as e:
-                # This catches permission errors or other I/O issues
-                print(f"Error reading file {relative_path}: {e}")
+                except IOError as e:
+                    # This catches permission errors or other I/O issues
+                    print(f"Error reading file {relative_path}: {e}")
 
-            except Exception as e:
-                # Catch-all for other unexpected errors
-                print(f"Unexpected error processing file {relative_path}: {e}")
+                except Exception as e:
+                    # Catch-all for other unexpected errors
+                    print(f"Unexpected error processing file {relative_path}: {e}")
 
-    # --- Writing the Output File ---
-    try:
-        with open(output_file_path, 'w', encoding='utf-8') as f:
-            f.write("".join(all_file_contents))
+                else:
+                    # 3. Write the content in the requested format.
+                    # Errors here are about the output file, so they are not caught above.
+                    write(relative_path.encode('utf-8', 'replace'))
+                    write(BLOCK_START)
+                    write(content)
+                    write(BLOCK_END)
         
         print("\n" + "="*50)
         print("✅ Success! Project snapshot created.")
@@ -194,9 +913,9 @@ if __name__ == "__main__":
 
     # --- 3. Handle Exclusions ---
     
-    # Start with a base set of common, high-noise directories
+    # A base list of common, high-noise directories
     # These will be excluded regardless of user choice.
-    final_exclude_patterns = {
+    default_exclude_patterns = [
         '.git', 
         'node_modules', 
         '__pycache__', 
@@ -209,7 +928,10 @@ if __name__ == "__main__":
         '*.pyc',
         '*.tmp',
         '.DS_Store'
-    }
+    ]
+
+    # Patterns from .gitignore or the user, in their original order
+    extra_exclude_patterns: List[str] = []
 
     gitignore_path = os.path.join(project_path, ".gitignore")
     
@@ -222,14 +944,14 @@ if __name__ == "__main__":
             # User said yes, parse the file
             print("Loading patterns from .gitignore...")
             gitignore_patterns = parse_gitignore(gitignore_path)
-            final_exclude_patterns.update(gitignore_patterns)
+            extra_exclude_patterns.extend(gitignore_patterns)
             print(f"Loaded {len(gitignore_patterns)} new patterns from .gitignore.")
         
         else:
             # User said no, ask for manual input
             print("Ignoring .gitignore file.")
             user_patterns = get_user_exclusions()
-            final_exclude_patterns.update(user_patterns)
+            extra_exclude_patterns.extend(user_patterns)
             
     else:
         # No .gitignore file was found
@@ -238,10 +960,13 @@ if __name__ == "__main__":
         
         if add_manual in ('yes', 'y'):
             user_patterns = get_user_exclusions()
-            final_exclude_patterns.update(user_patterns)
+            extra_exclude_patterns.extend(user_patterns)
             
         else:
             print("Proceeding with default exclusions only.")
 
     # --- 4. Run the Snapshot ---
+    # The defaults come last: the last matching pattern wins, so a '!' pattern
+    # (e.g., from a '*' / '!*/' whitelist) can never re-include '.git' and the like.
+    final_exclude_patterns = tuple(extra_exclude_patterns + default_exclude_patterns)
     create_project_snapshot(project_path, final_exclude_patterns, output_file_path)
\ No newline at end of file
@@ -0,0 +1,84 @@
+import unittest
+
+from main import ExclusionMatcher
+
+# (patterns, relative path, is_dir, expected result of is_excluded)
+EXCLUSION_CASES = [
+    # A pattern without a slash matches the name at any depth
+    (['*.log'], 'debug.log', False, True),
+    (['*.log'], 'src/logs/debug.log', False, True),
+    (['*.log'], 'debug.log.txt', False, False),
+    (['node_modules'], 'web/node_modules', True, True),
+    (['debug?.log'], 'debug1.log', False, True),
+    (['debug?.log'], 'debug10.log', False, False),
+
+    # '*' and '?' never match a '/'
+    (['src/*.py'], 'src/main.py', False, True),
+    (['src/*.py'], 'src/pkg/main.py', False, False),
+    (['src?main.py'], 'src/main.py', False, False),
+
+    # '**' matches across directories, including none at all
+    (['a/**/b'], 'a/b', True, True),
+    (['a/**/b'], 'a/x/y/b', True, True),
+    (['a/**/b'], 'x/a/b', True, False),
+    (['**/logs'], 'deep/down/logs', True, True),
+    (['logs/**'], 'logs/2024/debug.log', False, True),
+
+    # A leading or middle slash anchors the pattern to the project root
+    (['/build'], 'build', True, True),
+    (['/build'], 'src/build', True, False),
+    (['src/logs'], 'src/logs', True, True),
+    (['src/logs'], 'lib/src/logs', True, False),
+
+    # A trailing slash only matches directories
+    (['build/'], 'build', True, True),
+    (['build/'], 'build', False, False),
+    (['src/logs/'], 'src/logs', True, True),
+    (['src/logs/'], 'src/logs', False, False),
+
+    # The last matching pattern wins
+    (['*.log', '!keep.log'], 'keep.log', False, False),
+    (['*.log', '!keep.log'], 'other.log', False, True),
+    (['!keep.log', '*.log'], 'keep.log', False, True),
+    (['*.log', '!keep.log', 'keep.log'], 'keep.log', False, True),
+    (['*', '!*/', '!*.py'], 'src', True, False),
+    (['*', '!*/', '!*.py'], 'src/main.py', False, False),
+    (['*', '!*/', '!*.py'], 'src/notes.txt', False, True),
+
+    # Patterns added after a whitelist (like the defaults) can't be overridden by it
+    (['*', '!*/', '.git'], '.git', True, True),
+    (['!.git/', '.git'], '.git', True, True),
+
+    # Bracket expressions
+    (['[abc].txt'], 'b.txt', False, True),
+    (['[abc].txt'], 'd.txt', False, False),
+    (['file[0-9].txt'], 'file7.txt', False, True),
+    (['file[!0-9].txt'], 'file7.txt', False, False),
+    (['file[!0-9].txt'], 'filex.txt', False, True),
+    (['[]a].txt'], '].txt', False, True),
+    (['[\\]]x'], ']x', False, True),
+    (['[\\]]x'], '\\]x', False, False),
+    (['[[:digit:]].log'], '1.log', False, True),
+    (['[[:digit:]].log'], 'a.log', False, False),
+    (['[z-a]x'], 'qx', False, False),
+    (['a[.-0]b'], 'a/b', False, False),
+    (['a[!x]b'], 'a/b', False, False),
+    (['[x'], '[x', False, True),
+
+    # A backslash makes the next character literal
+    (['\\#notes'], '#notes', False, True),
+    (['\\*.txt'], '*.txt', False, True),
+    (['\\*.txt'], 'a.txt', False, False),
+]
+
+class ExclusionMatcherTest(unittest.TestCase):
+
+    def test_is_excluded(self) -> None:
+        for patterns, relative_path, is_dir, expected in EXCLUSION_CASES:
+            name = relative_path.rsplit('/', 1)[-1]
+            with self.subTest(patterns=patterns, path=relative_path, is_dir=is_dir):
+                matcher = ExclusionMatcher(patterns)
+                self.assertEqual(matcher.is_excluded(name, relative_path, is_dir), expected)
+
+if __name__ == "__main__":
+    unittest.main()